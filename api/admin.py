@@ -2,7 +2,7 @@
 
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, UserSetting, UserStatus, UserProgressSummary, PracticeSession
+from .models import User, UserSetting, UserStatus, UserProgressSummary, PracticeSession, PhonemeCohortStat, LeaderboardEntry
 
 # This custom admin class allows us to customize how the new User model is displayed.
 class CustomUserAdmin(UserAdmin):
@@ -18,3 +18,5 @@ admin.site.register(UserSetting)
 admin.site.register(UserStatus)
 admin.site.register(UserProgressSummary)
 admin.site.register(PracticeSession)
+admin.site.register(PhonemeCohortStat)
+admin.site.register(LeaderboardEntry)
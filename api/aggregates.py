@@ -0,0 +1,159 @@
+# api/aggregates.py
+#
+# 維護 PhonemeCohortStat 與 LeaderboardEntry 這兩張預先計算的彙總表。
+# - record_* / discard_* 由 api/signals.py 在每次寫入時呼叫，以 F() 運算式在資料庫端做增量更新，
+#   讀取時就不需要再對 UserProgressSummary / PracticeSession 做 GROUP BY。
+# - rebuild_* 由 refresh_cohort_stats 指令呼叫，從原始資料整張重建
+#   (bulk_create / queryset.update 不會觸發 signal，需要靠它定期補齊)。
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast
+from django.db.models.lookups import GreaterThan
+
+from .models import LeaderboardEntry, PhonemeCohortStat, PracticeSession, UserProgressSummary
+
+
+def _ratio(numerator, denominator):
+    # 分母為 0 時回傳 0，並強制使用浮點除法
+    return Case(
+        When(GreaterThan(denominator, 0), then=Cast(numerator, FloatField()) / denominator),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def _upsert(model, lookup, defaults, updates):
+    # 先嘗試 UPDATE；若該列不存在才 INSERT。併發時 INSERT 撞到 unique_together 就退回 UPDATE。
+    if model.objects.filter(**lookup).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **defaults)
+    except IntegrityError:
+        model.objects.filter(**lookup).update(**updates)
+
+
+# --- PhonemeCohortStat ---
+def apply_phoneme_delta(language, phoneme, total_atmp=0, err_amount=0, learner_count=0):
+    total = F('total_atmp') + total_atmp
+    errors = F('err_amount') + err_amount
+    _upsert(
+        PhonemeCohortStat,
+        {'language': language, 'phoneme': phoneme},
+        {
+            'total_atmp': total_atmp,
+            'err_amount': err_amount,
+            'learner_count': learner_count,
+            'error_rate': err_amount / total_atmp if total_atmp > 0 else 0.0,
+        },
+        {
+            'total_atmp': total,
+            'err_amount': errors,
+            'learner_count': F('learner_count') + learner_count,
+            'error_rate': _ratio(errors, total),
+        },
+    )
+    if learner_count < 0:
+        # 最後一位使用者的紀錄被移除時，整列刪除，與 rebuild_phoneme_stats 的結果一致
+        PhonemeCohortStat.objects.filter(language=language, phoneme=phoneme, learner_count__lte=0).delete()
+
+
+# --- LeaderboardEntry ---
+def record_session(session):
+    rate = session.error_rate
+    _upsert(
+        LeaderboardEntry,
+        {'user_id': session.user_id, 'language': session.language, 'diffi_level': session.diffi_level},
+        {'session_count': 1, 'error_rate_sum': rate, 'avg_error_rate': rate},
+        {
+            'session_count': F('session_count') + 1,
+            'error_rate_sum': F('error_rate_sum') + rate,
+            'avg_error_rate': _ratio(F('error_rate_sum') + rate, F('session_count') + 1),
+        },
+    )
+
+
+def discard_session(session):
+    entries = LeaderboardEntry.objects.filter(
+        user_id=session.user_id, language=session.language, diffi_level=session.diffi_level,
+    )
+    # 最後一筆練習被刪除時，整列移除，避免排行榜出現 0 次練習的使用者
+    entries.filter(session_count__lte=1).delete()
+    entries.update(
+        session_count=F('session_count') - 1,
+        error_rate_sum=F('error_rate_sum') - session.error_rate,
+        avg_error_rate=_ratio(F('error_rate_sum') - session.error_rate, F('session_count') - 1),
+    )
+
+
+def leaderboard_queryset(language, diffi_level):
+    # 與 api_leaderboard_rank_idx 的欄位順序一致，排序可直接走索引
+    return (
+        LeaderboardEntry.objects
+        .filter(language=language, diffi_level=diffi_level)
+        .order_by('avg_error_rate', '-session_count', 'user_id')
+    )
+
+
+def rank_of(entry):
+    # 名次 = 排在此列之前的列數 + 1，只需在索引上做一次範圍計數
+    ahead = (
+        Q(avg_error_rate__lt=entry.avg_error_rate)
+        | Q(avg_error_rate=entry.avg_error_rate, session_count__gt=entry.session_count)
+        | Q(avg_error_rate=entry.avg_error_rate, session_count=entry.session_count, user_id__lt=entry.user_id)
+    )
+    return leaderboard_queryset(entry.language, entry.diffi_level).filter(ahead).count() + 1
+
+
+# --- 整張重建 ---
+@transaction.atomic
+def rebuild_phoneme_stats(batch_size=2000):
+    PhonemeCohortStat.objects.all().delete()
+    rows = (
+        UserProgressSummary.objects
+        .values('language', 'phoneme')
+        .annotate(total=Sum('total_atmp'), errors=Sum('err_amount'), learners=Count('user', distinct=True))
+        .order_by()
+    )
+    PhonemeCohortStat.objects.bulk_create(
+        (
+            PhonemeCohortStat(
+                language=row['language'],
+                phoneme=row['phoneme'],
+                total_atmp=row['total'],
+                err_amount=row['errors'],
+                learner_count=row['learners'],
+                error_rate=row['errors'] / row['total'] if row['total'] else 0.0,
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=batch_size,
+    )
+    return PhonemeCohortStat.objects.count()
+
+
+@transaction.atomic
+def rebuild_leaderboard(batch_size=2000):
+    LeaderboardEntry.objects.all().delete()
+    rows = (
+        PracticeSession.objects
+        .values('user_id', 'language', 'diffi_level')
+        .annotate(count=Count('psid'), rate_sum=Sum('error_rate'))
+        .order_by()
+    )
+    LeaderboardEntry.objects.bulk_create(
+        (
+            LeaderboardEntry(
+                user_id=row['user_id'],
+                language=row['language'],
+                diffi_level=row['diffi_level'],
+                session_count=row['count'],
+                error_rate_sum=row['rate_sum'],
+                avg_error_rate=row['rate_sum'] / row['count'],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=batch_size,
+    )
+    return LeaderboardEntry.objects.count()
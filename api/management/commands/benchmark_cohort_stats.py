@@ -0,0 +1,135 @@
+# api/management/commands/benchmark_cohort_stats.py
+#
+# 產生大量假資料 (預設 50k 使用者)，比較「每次請求做 GROUP BY」與「讀取預先計算彙總表」的耗時。
+# 所有資料都寫在一個 transaction 中，結束後整個 rollback，不會留下任何資料。
+
+import random
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Avg, Count, F, FloatField, Sum
+from django.db.models.functions import Cast
+
+from api import aggregates
+from api.models import PhonemeCohortStat, PracticeSession, UserProgressSummary
+
+User = get_user_model()
+
+LANGUAGES = ['en', 'zh']
+LEVELS = ['Kindergarten', 'Primary', 'Secondary']
+PHONEMES = ['p', 'b', 't', 'd', 'k', 'g', 'f', 'v', 'θ', 'ð', 's', 'z', 'ʃ', 'ʒ', 'h', 'm', 'n', 'ŋ', 'l', 'r']
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Benchmark cohort leaderboard / phoneme stats queries against on-the-fly GROUP BY."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50000)
+        parser.add_argument('--sessions-per-user', type=int, default=4)
+        parser.add_argument('--phonemes-per-user', type=int, default=5)
+        parser.add_argument('--repeat', type=int, default=20, help="Query repetitions per measurement")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options)
+                raise _Rollback()
+        except _Rollback:
+            self.stdout.write("Benchmark data rolled back.")
+
+    def _timed(self, label, func, repeat=1):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = func()
+        elapsed = (time.perf_counter() - start) / repeat
+        self.stdout.write(f"  {label:<40} {elapsed * 1000:10.2f} ms")
+        return result
+
+    def _run(self, options):
+        rng = random.Random(options['seed'])
+        n_users, repeat = options['users'], options['repeat']
+
+        self.stdout.write(f"Seeding {n_users} users...")
+        # 每次執行使用不同的前綴，避免與既有使用者的 username / email 衝突
+        prefix = f'bench-{uuid.uuid4().hex[:8]}-'
+        User.objects.bulk_create(
+            (User(username=f'{prefix}{i}', email=f'{prefix}{i}@example.com', password='!') for i in range(n_users)),
+            batch_size=2000,
+        )
+        user_ids = list(User.objects.filter(username__startswith=prefix).values_list('id', flat=True))
+
+        PracticeSession.objects.bulk_create(
+            (
+                PracticeSession(
+                    user_id=uid, input_mp3_path='', output_txt='', full_log='', target_word='word',
+                    language=rng.choice(LANGUAGES), diffi_level=rng.choice(LEVELS), error_rate=rng.random(),
+                )
+                for uid in user_ids
+                for _ in range(options['sessions_per_user'])
+            ),
+            batch_size=2000,
+        )
+        summaries = []
+        for uid in user_ids:
+            for phoneme in rng.sample(PHONEMES, options['phonemes_per_user']):
+                total = rng.randint(1, 50)
+                summaries.append(UserProgressSummary(
+                    user_id=uid, language=rng.choice(LANGUAGES), phoneme=phoneme,
+                    total_atmp=total, err_amount=rng.randint(0, total),
+                ))
+        UserProgressSummary.objects.bulk_create(summaries, batch_size=2000, ignore_conflicts=True)
+
+        self.stdout.write("Full rebuild (refresh_cohort_stats):")
+        self._timed("rebuild_phoneme_stats", aggregates.rebuild_phoneme_stats)
+        self._timed("rebuild_leaderboard", aggregates.rebuild_leaderboard)
+
+        language, level = 'en', 'Kindergarten'
+        board = aggregates.leaderboard_queryset(language, level)
+        board_size = board.count()
+        entry = board[board_size // 2] if board_size else None
+
+        self.stdout.write("Leaderboard top 20:")
+        self._timed("GROUP BY PracticeSession", lambda: list(
+            PracticeSession.objects
+            .filter(language=language, diffi_level=level)
+            .values('user_id')
+            .annotate(avg=Avg('error_rate'), count=Count('psid'))
+            .order_by('avg', '-count', 'user_id')[:20]
+        ), repeat)
+        self._timed("LeaderboardEntry index lookup", lambda: list(
+            aggregates.leaderboard_queryset(language, level).select_related('user')[:20]
+        ), repeat)
+
+        if entry is not None:
+            self.stdout.write("Single user rank:")
+            self._timed("LeaderboardEntry rank_of", lambda: aggregates.rank_of(entry), repeat)
+
+        self.stdout.write("Phoneme error rates:")
+        self._timed("GROUP BY UserProgressSummary", lambda: list(
+            UserProgressSummary.objects
+            .filter(language=language)
+            .values('phoneme')
+            .annotate(total=Sum('total_atmp'), errors=Sum('err_amount'))
+            .annotate(rate=Cast(F('errors'), FloatField()) / F('total'))
+            .order_by('-rate')
+        ), repeat)
+        self._timed("PhonemeCohortStat index lookup", lambda: list(
+            PhonemeCohortStat.objects.filter(language=language).order_by('-error_rate')
+        ), repeat)
+
+        if entry is None:
+            self.stdout.write(f"No leaderboard entries for {language}/{level}; skipping rank and write benchmarks.")
+            return
+        self.stdout.write("Incremental write path (signals):")
+        self._timed("PracticeSession.save + record_session", lambda: PracticeSession.objects.create(
+            user_id=entry.user_id, input_mp3_path='', output_txt='', full_log='', target_word='word',
+            language=language, diffi_level=level, error_rate=rng.random(),
+        ), repeat)
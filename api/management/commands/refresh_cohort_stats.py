@@ -0,0 +1,19 @@
+# api/management/commands/refresh_cohort_stats.py
+#
+# 從 UserProgressSummary / PracticeSession 整張重建班級彙總表。
+# 平時由 signal 增量維護；此指令供定期排程 (cron) 使用，以修正批次匯入等未觸發 signal 的寫入。
+
+from django.core.management.base import BaseCommand
+
+from api import aggregates
+
+
+class Command(BaseCommand):
+    help = "Rebuild the precomputed cohort leaderboard and phoneme stats tables."
+
+    def handle(self, *args, **options):
+        phonemes = aggregates.rebuild_phoneme_stats()
+        entries = aggregates.rebuild_leaderboard()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {phonemes} phoneme stat rows and {entries} leaderboard entries."
+        ))
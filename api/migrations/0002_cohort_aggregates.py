@@ -0,0 +1,47 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PhonemeCohortStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=2)),
+                ('phoneme', models.CharField(max_length=255)),
+                ('total_atmp', models.IntegerField(default=0)),
+                ('err_amount', models.IntegerField(default=0)),
+                ('learner_count', models.IntegerField(default=0, help_text='Users with a progress summary for this phoneme')),
+                ('error_rate', models.FloatField(default=0, help_text='err_amount / total_atmp, stored so it can be indexed')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['language', '-error_rate'], name='api_cohort_lang_rate_idx')],
+                'unique_together': {('language', 'phoneme')},
+            },
+        ),
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=2)),
+                ('diffi_level', models.CharField(max_length=20)),
+                ('session_count', models.IntegerField(default=0)),
+                ('error_rate_sum', models.FloatField(default=0)),
+                ('avg_error_rate', models.FloatField(default=0, help_text='error_rate_sum / session_count, stored so it can be indexed')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['language', 'diffi_level', 'avg_error_rate', '-session_count', 'user'], name='api_leaderboard_rank_idx')],
+                'unique_together': {('user', 'language', 'diffi_level')},
+            },
+        ),
+    ]
@@ -79,3 +79,32 @@ class PracticeSession(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     def __str__(self):
         return f"Session {self.psid} for {self.user.username}"
+
+# --- 班級層級的預先計算彙總表 (由 api/aggregates.py 增量維護) ---
+class PhonemeCohortStat(models.Model):
+    language = models.CharField(max_length=2)
+    phoneme = models.CharField(max_length=255)
+    total_atmp = models.IntegerField(default=0)
+    err_amount = models.IntegerField(default=0)
+    learner_count = models.IntegerField(default=0, help_text="Users with a progress summary for this phoneme")
+    error_rate = models.FloatField(default=0, help_text="err_amount / total_atmp, stored so it can be indexed")
+    class Meta:
+        unique_together = ('language', 'phoneme')
+        indexes = [models.Index(fields=['language', '-error_rate'], name='api_cohort_lang_rate_idx')]
+    def __str__(self):
+        return f"Cohort stat for '{self.phoneme}' in {self.language}"
+
+class LeaderboardEntry(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='leaderboard_entries')
+    language = models.CharField(max_length=2)
+    diffi_level = models.CharField(max_length=20)
+    session_count = models.IntegerField(default=0)
+    error_rate_sum = models.FloatField(default=0)
+    avg_error_rate = models.FloatField(default=0, help_text="error_rate_sum / session_count, stored so it can be indexed")
+    class Meta:
+        unique_together = ('user', 'language', 'diffi_level')
+        indexes = [
+            models.Index(fields=['language', 'diffi_level', 'avg_error_rate', '-session_count', 'user'], name='api_leaderboard_rank_idx'),
+        ]
+    def __str__(self):
+        return f"Leaderboard entry for {self.user.username} in {self.language}/{self.diffi_level}"
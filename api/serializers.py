@@ -6,7 +6,7 @@ from django.contrib.auth import get_user_model, authenticate
 #    然後對其進行【繼承和擴展】，這是最標準、最穩健的做法。
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
-from .models import UserSetting, UserStatus
+from .models import UserSetting, UserStatus, LeaderboardEntry, PhonemeCohortStat
 
 User = get_user_model()
 
@@ -97,3 +97,22 @@ class InitialTestStatusSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserStatus
         fields = ('language', 'test_completed_count', 'is_test_completed', 'cur_word', 'cur_log', 'current_difficulty_level')
+
+# --- 班級層級的排行榜與音素統計，直接讀取預先計算的彙總表 ---
+class AnonymousLeaderboardEntrySerializer(serializers.ModelSerializer):
+    # rank 由 view 依查詢位置 (或 aggregates.rank_of) 附加在物件上
+    # 不含 username：一般使用者只能看到其他人的名次與成績，看不到是誰
+    rank = serializers.IntegerField(read_only=True)
+    class Meta:
+        model = LeaderboardEntry
+        fields = ('rank', 'session_count', 'avg_error_rate')
+
+class LeaderboardEntrySerializer(AnonymousLeaderboardEntrySerializer):
+    username = serializers.CharField(source='user.username', read_only=True)
+    class Meta(AnonymousLeaderboardEntrySerializer.Meta):
+        fields = ('rank', 'username', 'session_count', 'avg_error_rate')
+
+class PhonemeCohortStatSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PhonemeCohortStat
+        fields = ('phoneme', 'total_atmp', 'err_amount', 'learner_count', 'error_rate')
@@ -0,0 +1,89 @@
+# api/signals.py
+#
+# 每次寫入 UserProgressSummary / PracticeSession 時，同步增量更新 api/aggregates.py 中的彙總表。
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import aggregates
+from .models import PracticeSession, UserProgressSummary
+
+
+SUMMARY_FIELDS = ('language', 'phoneme', 'total_atmp', 'err_amount')
+
+
+def _summary_row(pk):
+    return UserProgressSummary.objects.filter(pk=pk).values(*SUMMARY_FIELDS).first()
+
+
+@receiver(pre_save, sender=UserProgressSummary)
+def snapshot_progress_summary(sender, instance, raw=False, **kwargs):
+    # 記下更新前的數值，post_save 時只需套用差值
+    instance._aggregate_snapshot = None
+    if raw or instance.pk is None:
+        return
+    instance._aggregate_snapshot = _summary_row(instance.pk)
+
+
+@receiver(post_save, sender=UserProgressSummary)
+def apply_progress_summary(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = getattr(instance, '_aggregate_snapshot', None)
+    # 以資料庫中實際寫入的數值計算差值；save(update_fields=...) 時記憶體中其他欄位可能已過期
+    new = _summary_row(instance.pk)
+    if old and (old['language'], old['phoneme']) != (new['language'], new['phoneme']):
+        aggregates.apply_phoneme_delta(
+            old['language'], old['phoneme'],
+            total_atmp=-old['total_atmp'], err_amount=-old['err_amount'], learner_count=-1,
+        )
+        old = None
+    aggregates.apply_phoneme_delta(
+        new['language'], new['phoneme'],
+        total_atmp=new['total_atmp'] - (old['total_atmp'] if old else 0),
+        err_amount=new['err_amount'] - (old['err_amount'] if old else 0),
+        learner_count=0 if old else 1,
+    )
+
+
+@receiver(post_delete, sender=UserProgressSummary)
+def discard_progress_summary(sender, instance, **kwargs):
+    aggregates.apply_phoneme_delta(
+        instance.language, instance.phoneme,
+        total_atmp=-instance.total_atmp, err_amount=-instance.err_amount, learner_count=-1,
+    )
+
+
+SESSION_FIELDS = ('user_id', 'language', 'diffi_level', 'error_rate')
+
+
+def _session_row(pk):
+    row = PracticeSession.objects.filter(pk=pk).values(*SESSION_FIELDS).first()
+    return PracticeSession(**row) if row else None
+
+
+@receiver(pre_save, sender=PracticeSession)
+def snapshot_practice_session(sender, instance, raw=False, **kwargs):
+    # 練習紀錄可能在 admin 中被修改 (error_rate / language / diffi_level)，先記下舊值
+    instance._aggregate_snapshot = None
+    if raw or instance.pk is None:
+        return
+    instance._aggregate_snapshot = _session_row(instance.pk)
+
+
+@receiver(post_save, sender=PracticeSession)
+def record_practice_session(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = getattr(instance, '_aggregate_snapshot', None)
+    if old is not None:
+        # 修改：先移除舊值的貢獻，再加入實際寫入的新值
+        aggregates.discard_session(old)
+        aggregates.record_session(_session_row(instance.pk))
+    elif created:
+        aggregates.record_session(instance)
+
+
+@receiver(post_delete, sender=PracticeSession)
+def discard_practice_session(sender, instance, **kwargs):
+    aggregates.discard_session(instance)
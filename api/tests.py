@@ -1,3 +1,161 @@
+from io import StringIO
+
 from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from . import aggregates
+from .models import LeaderboardEntry, PhonemeCohortStat, PracticeSession, UserProgressSummary
+
+User = get_user_model()
+
+
+def make_session(user, error_rate, language='en', level='Kindergarten'):
+    return PracticeSession.objects.create(
+        user=user, input_mp3_path='', output_txt='', full_log='', target_word='cat',
+        language=language, diffi_level=level, error_rate=error_rate,
+    )
+
+
+class CohortAggregateTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', email='alice@example.com', password='pw')
+        self.bob = User.objects.create_user(username='bob', email='bob@example.com', password='pw')
+
+    def test_sessions_update_leaderboard_incrementally(self):
+        make_session(self.alice, 0.2)
+        session = make_session(self.alice, 0.4)
+        entry = LeaderboardEntry.objects.get(user=self.alice, language='en', diffi_level='Kindergarten')
+        self.assertEqual(entry.session_count, 2)
+        self.assertAlmostEqual(entry.avg_error_rate, 0.3)
+
+        session.delete()
+        entry.refresh_from_db()
+        self.assertEqual(entry.session_count, 1)
+        self.assertAlmostEqual(entry.avg_error_rate, 0.2)
+
+        PracticeSession.objects.filter(user=self.alice).first().delete()
+        self.assertFalse(LeaderboardEntry.objects.filter(user=self.alice).exists())
+
+    def test_edited_session_moves_its_contribution(self):
+        make_session(self.alice, 0.2)
+        session = make_session(self.alice, 0.4)
+        session.error_rate = 0.8
+        session.save()
+        entry = LeaderboardEntry.objects.get(user=self.alice, language='en', diffi_level='Kindergarten')
+        self.assertEqual(entry.session_count, 2)
+        self.assertAlmostEqual(entry.avg_error_rate, 0.5)
+
+        session.diffi_level = 'Primary'
+        session.save()
+        entry.refresh_from_db()
+        self.assertEqual(entry.session_count, 1)
+        self.assertAlmostEqual(entry.avg_error_rate, 0.2)
+        moved = LeaderboardEntry.objects.get(user=self.alice, language='en', diffi_level='Primary')
+        self.assertAlmostEqual(moved.avg_error_rate, 0.8)
+
+        session.delete()
+        self.assertFalse(LeaderboardEntry.objects.filter(diffi_level='Primary').exists())
+
+    def test_progress_summary_updates_phoneme_stats(self):
+        summary = UserProgressSummary.objects.create(user=self.alice, language='en', phoneme='θ', total_atmp=4, err_amount=1)
+        UserProgressSummary.objects.create(user=self.bob, language='en', phoneme='θ', total_atmp=6, err_amount=4)
+        summary.total_atmp, summary.err_amount = 10, 5
+        summary.save()
+
+        stat = PhonemeCohortStat.objects.get(language='en', phoneme='θ')
+        self.assertEqual((stat.total_atmp, stat.err_amount, stat.learner_count), (16, 9, 2))
+        self.assertAlmostEqual(stat.error_rate, 9 / 16)
+
+        summary.delete()
+        stat.refresh_from_db()
+        self.assertEqual((stat.total_atmp, stat.err_amount, stat.learner_count), (6, 4, 1))
+
+    def test_update_fields_save_only_applies_written_fields(self):
+        summary = UserProgressSummary.objects.create(user=self.alice, language='en', phoneme='θ', total_atmp=4, err_amount=1)
+        # 繞過 signal 的寫入，讓記憶體中的 total_atmp 變成過期值
+        UserProgressSummary.objects.filter(pk=summary.pk).update(total_atmp=10)
+        summary.err_amount = 3
+        summary.save(update_fields=['err_amount'])
+
+        stat = PhonemeCohortStat.objects.get(language='en', phoneme='θ')
+        self.assertEqual((stat.total_atmp, stat.err_amount, stat.learner_count), (4, 3, 1))
+
+    def test_phoneme_stat_removed_with_last_learner(self):
+        UserProgressSummary.objects.create(user=self.alice, language='en', phoneme='s', total_atmp=4, err_amount=1)
+        moved = UserProgressSummary.objects.create(user=self.bob, language='en', phoneme='s', total_atmp=2, err_amount=2)
+        self.alice.delete()
+        self.assertEqual(PhonemeCohortStat.objects.get(language='en', phoneme='s').learner_count, 1)
+
+        moved.phoneme = 'z'
+        moved.save()
+        self.assertFalse(PhonemeCohortStat.objects.filter(phoneme='s').exists())
+        self.assertEqual(PhonemeCohortStat.objects.get(language='en', phoneme='z').learner_count, 1)
+
+        moved.delete()
+        self.assertFalse(PhonemeCohortStat.objects.exists())
+
+    def test_rank_and_rebuild_match_incremental_state(self):
+        make_session(self.alice, 0.5)
+        make_session(self.bob, 0.1)
+        make_session(self.bob, 0.3)
+        UserProgressSummary.objects.create(user=self.alice, language='en', phoneme='r', total_atmp=3, err_amount=2)
+        before = sorted(LeaderboardEntry.objects.values_list('user_id', 'session_count', 'avg_error_rate'))
+        phonemes_before = list(PhonemeCohortStat.objects.values_list('phoneme', 'total_atmp', 'err_amount', 'learner_count'))
+
+        call_command('refresh_cohort_stats', stdout=StringIO())
+        after = sorted(LeaderboardEntry.objects.values_list('user_id', 'session_count', 'avg_error_rate'))
+        self.assertEqual([row[:2] for row in before], [row[:2] for row in after])
+        for (_, _, a), (_, _, b) in zip(before, after):
+            self.assertAlmostEqual(a, b)
+        self.assertEqual(phonemes_before, list(PhonemeCohortStat.objects.values_list('phoneme', 'total_atmp', 'err_amount', 'learner_count')))
+
+        entry = LeaderboardEntry.objects.get(user=self.alice)
+        self.assertEqual(aggregates.rank_of(entry), 2)
+
+
+class CohortViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.users = [
+            User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='pw')
+            for i in range(3)
+        ]
+        for user, rate in zip(self.users, [0.6, 0.2, 0.4]):
+            make_session(user, rate)
+        self.client.force_authenticate(self.users[0])
+
+    def test_leaderboard_returns_top_and_own_rank(self):
+        self.users[0].is_staff = True
+        self.users[0].save()
+        response = self.client.get('/api/cohort/leaderboard/', {'lang': 'en', 'level': 'Kindergarten', 'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['username'] for row in response.data['results']], ['user1', 'user2'])
+        self.assertEqual([row['rank'] for row in response.data['results']], [1, 2])
+        self.assertEqual(response.data['me']['rank'], 3)
+
+    def test_leaderboard_hides_other_usernames_from_non_staff(self):
+        response = self.client.get('/api/cohort/leaderboard/', {'lang': 'en', 'level': 'Kindergarten'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['rank'] for row in response.data['results']], [1, 2, 3])
+        for row in response.data['results']:
+            self.assertNotIn('username', row)
+        self.assertNotIn('user1', str(response.data))
+        self.assertEqual(response.data['me']['username'], 'user0')
+
+    def test_phoneme_stats_require_staff(self):
+        self.assertEqual(self.client.get('/api/cohort/phonemes/').status_code, 403)
+
+    def test_phoneme_stats_ordered_by_error_rate(self):
+        self.users[0].is_staff = True
+        self.users[0].save()
+        UserProgressSummary.objects.create(user=self.users[0], language='en', phoneme='s', total_atmp=10, err_amount=1)
+        UserProgressSummary.objects.create(user=self.users[0], language='en', phoneme='ʃ', total_atmp=10, err_amount=7)
+        response = self.client.get('/api/cohort/phonemes/', {'lang': 'en'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['phoneme'] for row in response.data['results']], ['ʃ', 's'])
 
-# Create your tests here.
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/api/cohort/leaderboard/').status_code, 401)
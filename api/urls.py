@@ -8,7 +8,9 @@ from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from .views import (
     RegisterView, 
     ProfileView, 
-    InitialTestStatusView
+    InitialTestStatusView,
+    LeaderboardView,
+    CohortPhonemeStatsView,
 )
 
 urlpatterns = [
@@ -23,4 +25,6 @@ urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
     path('profile/', ProfileView.as_view(), name='profile'),
     path('initial-test/status/', InitialTestStatusView.as_view(), name='initial-test-status'),
+    path('cohort/leaderboard/', LeaderboardView.as_view(), name='cohort-leaderboard'),
+    path('cohort/phonemes/', CohortPhonemeStatsView.as_view(), name='cohort-phonemes'),
 ]
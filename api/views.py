@@ -3,8 +3,12 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
-from .models import UserSetting, UserStatus
-from .serializers import RegisterSerializer, UserProfileSerializer, InitialTestStatusSerializer
+from . import aggregates
+from .models import UserSetting, UserStatus, LeaderboardEntry, PhonemeCohortStat
+from .serializers import (
+    RegisterSerializer, UserProfileSerializer, InitialTestStatusSerializer,
+    LeaderboardEntrySerializer, AnonymousLeaderboardEntrySerializer, PhonemeCohortStatSerializer,
+)
 
 User = get_user_model()
 
@@ -74,3 +78,55 @@ class InitialTestStatusView(generics.GenericAPIView):
             status_obj.save()
 
         return Response(self.get_serializer(status_obj).data)
+
+# --- 班級檢視：只做索引查詢，不在請求中對原始資料做 GROUP BY ---
+def _limit_param(request, default=20, maximum=100):
+    try:
+        limit = int(request.query_params.get('limit', default))
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, maximum))
+
+class LeaderboardView(generics.GenericAPIView):
+    # 練習成績屬於敏感資料：只有 staff (教師) 能看到其他使用者的名稱，
+    # 一般使用者看到的排行榜是匿名的，只有自己的 me 這一列帶有名稱
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = LeaderboardEntrySerializer
+
+    def get_results_serializer_class(self):
+        if self.request.user.is_staff:
+            return LeaderboardEntrySerializer
+        return AnonymousLeaderboardEntrySerializer
+
+    def get(self, request, *args, **kwargs):
+        language = request.query_params.get('lang', 'en')
+        level = request.query_params.get('level', 'Kindergarten')
+        limit = _limit_param(request)
+
+        top = list(aggregates.leaderboard_queryset(language, level).select_related('user')[:limit])
+        for position, entry in enumerate(top, start=1):
+            entry.rank = position
+
+        me = LeaderboardEntry.objects.filter(user=request.user, language=language, diffi_level=level).first()
+        if me is not None:
+            me.rank = aggregates.rank_of(me)
+
+        return Response({
+            'language': language,
+            'difficulty_level': level,
+            'results': self.get_results_serializer_class()(top, many=True).data,
+            'me': self.get_serializer(me).data if me is not None else None,
+        })
+
+class CohortPhonemeStatsView(generics.GenericAPIView):
+    # 班級統計是教師用的檢視，只開放給 staff
+    permission_classes = [permissions.IsAdminUser]
+    serializer_class = PhonemeCohortStatSerializer
+
+    def get(self, request, *args, **kwargs):
+        language = request.query_params.get('lang', 'en')
+        stats = PhonemeCohortStat.objects.filter(language=language).order_by('-error_rate')[:_limit_param(request)]
+        return Response({
+            'language': language,
+            'results': self.get_serializer(stats, many=True).data,
+        })